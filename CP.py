@@ -1,5 +1,10 @@
-from z3 import Solver, Int, sat, Distinct, Or, If, Abs, Sum
+from z3 import (Solver, SolverFor, Int, Bool, sat, unsat, Distinct, Or, And, Not, If, Abs, Sum, PbEq, AtMost,
+                Context, is_true)
+from concurrent.futures import ThreadPoolExecutor
+import time
 import networkx as nx
+import numpy as np
+from labeled_copies import LabeledCopies, INF_LABEL, LABEL_DTYPE
 
 
 def rename_nodes_by_labels(graph):
@@ -8,11 +13,6 @@ def rename_nodes_by_labels(graph):
     return nx.relabel_nodes(graph, mapping)
 
 
-def construct_k_graph(graph, k):
-    """Returns a list of k identical copies of G."""
-    return [graph.copy() for _ in range(k)]
-
-
 def labeling_1_to_k(graph, r):
     """
     Builds a (1-2-...-k)-labeling for k copies of G, with node labels assigned correctly.
@@ -20,56 +20,104 @@ def labeling_1_to_k(graph, r):
     - Vertex labels can repeat across different copies.
     - ℓ(u, v) = |label_i[u] - label_i[v]| is in [1, k] for each copy.
     - ℓ^*(u, v) = (label_i[u] + label_i[v]) mod m for each edge.
-    - (ℓ, ℓ^*) pairs must be disjoint across copies.
+    - (ℓ, ℓ^*) pairs must be disjoint across copies, and every pair must occur.
+    Returns LabeledCopies like labeling_1_rotational_lambda, or None.
     """
     m = graph.number_of_edges()
     k = r // 2 if r % 2 == 0 else (r - 1) // 2
     if k <= 0:
         print("k <= 0, no labeling possible.")
+        return None
     elif (r ** 2) % (2 * m) != r % (2 * m):
         return None
 
-    # Create k identical copies of G
-    k_copies = construct_k_graph(graph, k)
-
-    s = Solver()
-
-    # Variables: From each copy of G in kG, each node gets a unique label in {0, ..., 2m-3}
-    label = {i: {v: Int(f'label_{i}_{v}') for v in graph.nodes()} for i in range(k)}
-    # Track all (ell, ell_star) pairs to ensure they are unique across all copies
-    all_pairs = []
+    nodes = list(graph.nodes())
+    index = {v: j for j, v in enumerate(nodes)}
+    edges = [(index[u], index[v]) for u, v in graph.edges()]
+    n = len(nodes)
 
-    for i in range(k):
-        # 1. Unique labels within a copy
-        s.add(Distinct([label[i][v] for v in graph.nodes()]))
-
-        for v in graph.nodes():
-            s.add(label[i][v] >= 0, label[i][v] <= 2 * m + r - 1)
-
-        for (u, v) in graph.edges():
-            # ℓ(u, v) = |label_u - label_v|
-            diff = Int(f'diff_{i}_{u}_{v}')
-            s.add(Or(diff == label[i][u] - label[i][v], diff == label[i][v] - label[i][u]))
-            s.add(diff >= 1, diff <= k)
+    if m % 2 == 0:
+        # label_u + label_v ≡ label_u - label_v (mod 2): ℓ^* has the parity of ℓ, so (1, 0) never occurs
+        print("m is even, no labeling possible.")
+        return None
+    degrees = np.bincount(np.array(edges, dtype=np.int64).reshape(-1), minlength=n)
+    if not (degrees % 2).any() and ((k + 1) // 2) % 2:
+        # An Eulerian copy splits into cycles, whose ±lengths sum to 0: every copy has an even
+        # number of odd lengths, but the pairs need m * ceil(k/2) of them in total, an odd number
+        print("G is Eulerian and m * ceil(k/2) is odd, no labeling possible.")
+        return None
 
-            # ℓ^*(u, v) = (label_u + label_v) mod m
-            l_star = (label[i][u] + label[i][v]) % m
+    print("Solving (1-2-...-k)-labeling...")
+    s, x = _one_to_k_model(n, edges, m, k, 2 * m + r)
+    if s.check() == sat:
+        print("Solution found.\n")
+        model = s.model()
+        values = np.array([[next(a for a, lit in enumerate(row) if is_true(model.eval(lit, model_completion=True)))
+                            for row in copy] for copy in x])
+        return _labeled_copies(graph, values)
 
-            # For disjointness across copies (diff, l_star) is unique
-            pair_hash = Int(f'pair_{i}_{u}_{v}')
-            s.add(pair_hash == diff * m + l_star)
-            all_pairs.append(pair_hash)
+    print("No solution.")
+    return None
 
-    # 4. Enforce (ℓ, ℓ^*)-disjointness: All edge pairs across copies must be different
-    s.add(Distinct(all_pairs))
 
-    # 5. Requirement: All possible pairs (ell, ell_star) must exist
-    for ell in range(1, k + 1):
-        for ell_star in range(m):
-            target = ell * m + ell_star
-            s.add(Or([p == target for p in all_pairs]))
+def _one_to_k_model(n, edges, m, k, size):
+    """
+    Finite-domain model of the (1-2-...-k)-labeling: x[i][v][a] says vertex v of copy i is labeled a
+    (0 <= a < size). Endpoint labels lie within k of each other and set one length indicator ℓ in 1..k
+    per (copy, edge); the ℓ^* indicator follows from the endpoint labels mod m. Every (ℓ, ℓ^*) pair is then
+    taken by exactly one edge, a cardinality constraint per pair instead of coverage disjunctions.
+    Symmetries removed: copies are ordered by the label of vertex 0, and each copy has a label below m
+    (shifting a copy by m keeps all its pairs).
+    """
+    s = SolverFor("QF_FD")
+    x = [[[Bool(f"x_{i}_{v}_{a}") for a in range(size)] for v in range(n)] for i in range(k)]
+    not_x = [[[Not(lit) for lit in row] for row in copy] for copy in x]
+    residue = [[[Or(row[c::m]) for c in range(m)] for row in copy] for copy in x]
+    holders = {}
 
-def labeling_1_rotational_lambda(graph, p):
+    for i in range(k):
+        for v in range(n):
+            s.add(PbEq([(lit, 1) for lit in x[i][v]], 1))
+        for a in range(size):
+            s.add(AtMost(*[x[i][v][a] for v in range(n)], 1))
+        s.add(Or([x[i][v][a] for v in range(n) for a in range(min(m, size))]))
+        if i > 0:
+            for a in range(size):
+                for b in range(a):
+                    s.add(Or(not_x[i - 1][0][a], not_x[i][0][b]))
+
+        for e, (u, v) in enumerate(edges):
+            length = [None] + [Bool(f"len_{i}_{e}_{ell}") for ell in range(1, k + 1)]
+            star = [Bool(f"star_{i}_{e}_{c}") for c in range(m)]
+            s.add(PbEq([(lit, 1) for lit in length[1:]], 1), PbEq([(lit, 1) for lit in star], 1))
+            clauses = []
+            for a in range(size):
+                window = [b for b in range(max(0, a - k), min(size, a + k + 1)) if b != a]
+                clauses.append(Or([not_x[i][u][a]] + [x[i][v][b] for b in window]))
+                for b in window:
+                    if b > a:
+                        clauses.append(Or(not_x[i][u][a], not_x[i][v][b], length[b - a]))
+                        clauses.append(Or(not_x[i][u][b], not_x[i][v][a], length[b - a]))
+            for c in range(m):
+                for d in range(m):
+                    clauses.append(Or(Not(residue[i][u][c]), Not(residue[i][v][d]), star[(c + d) % m]))
+            s.add(clauses)
+            for ell in range(1, k + 1):
+                for c in range(m):
+                    holders.setdefault((ell, c), []).append(And(length[ell], star[c]))
+
+    for lits in holders.values():
+        s.add(PbEq([(lit, 1) for lit in lits], 1))
+    return s, x
+
+
+def labeling_1_rotational_lambda(graph, p, decompose=False, workers=None):
+    """
+    1-rotational λ_p-labeling of (m+1)//2 copies of graph, as LabeledCopies (None if there is none).
+    decompose=True uses the two-phase solver (labeling_1_rotational_decomposed) instead of one model.
+    """
+    if decompose:
+        return labeling_1_rotational_decomposed(graph, p, workers=workers)
     m = graph.number_of_edges()
     copies = (m + 1) // 2
     max_label = p * m
@@ -120,7 +168,7 @@ def labeling_1_rotational_lambda(graph, p):
 
     # Residue condition:
     # No two edges with same label have same {f(u) mod m, f(v) mod m}
-    pair_hashes = {}
+    edge_hashes = []
 
     for i in range(copies):
         for (u, v) in graph.edges():
@@ -139,74 +187,224 @@ def labeling_1_rotational_lambda(graph, p):
             h = Int(f"hash_{i}_{u}_{v}")
             s.add(h == r1 * (m + 1) + r2)
 
-            if d not in pair_hashes:
-                pair_hashes[d] = []
+            edge_hashes.append((d, h))
 
-            pair_hashes[d].append(h)
-
-    for d in allowed:
-        if d in pair_hashes:
-            s.add(Distinct(pair_hashes[d]))
+    # Edges whose label is not a get a distinct negative placeholder, so only hashes labeled a must differ
+    for a in allowed:
+        s.add(Distinct([If(d == a, h, -1 - k) for k, (d, h) in enumerate(edge_hashes)]))
 
     print("Solving 1-rotational λ_p-labeling...")
     if s.check() == sat:
         print("Solution found.\n")
         model = s.model()
 
-        labeled_copies = []
+        values = np.array([[model[label[i][v]].as_long() for v in graph.nodes()] for i in range(copies)])
+        return _labeled_copies(graph, values, INF)
 
-        for i in range(copies):
-            print(f"Copy {i}:")
+    print("No solution.")
+    return None
 
-            g_copy = graph.copy()
-            labels = {}
 
-            for v in graph.nodes():
-                val = model[label[i][v]].as_long()
-                if val == INF:
-                    labels[v] = "∞"
-                else:
-                    labels[v] = val
+def _labeled_copies(graph, values, INF=None):
+    """Print the solved copies and pack them (INF -> INF_LABEL) into LabeledCopies."""
+    if INF is not None:
+        values = np.where(values == INF, INF_LABEL, values)
+    values = values.astype(LABEL_DTYPE).reshape(len(values), graph.number_of_nodes())
+    for i, row in enumerate(values.tolist()):
+        print(f"Copy {i}:")
+        for v, val in zip(graph.nodes(), row):
+            print(f"  Node {v} -> Label {'∞' if val == INF_LABEL else val}")
+        print()
+    return LabeledCopies(graph, values)
 
-                print(f"  Node {v} -> Label {labels[v]}")
 
-            nx.set_node_attributes(g_copy, labels, "label")
-            labeled_copies.append(g_copy)
+def _residue_hash(x, y, m, INF):
+    """Hash of the residue pair of an edge, as encoded in the rotational model."""
+    r1 = INF if x == INF else x % m
+    r2 = INF if y == INF else y % m
+    return r1 * (m + 1) + r2
 
-            print()
 
-        return labeled_copies
+def _distribution_model(n, edges, m, INF, copies):
+    """
+    Phase 1: which label every (copy, edge) gets, ignoring residues.
+    inf[i] is the vertex labeled ∞ in copy i (-1 for none); its edges get INF and every other
+    edge a length in 1..m//2, with exactly m edges per label. Around any cycle avoiding the
+    ∞ vertex the ±lengths sum to 0, so their sum must be even.
+    """
+    s = Solver()
+    allowed = list(range(1, m // 2 + 1)) + [INF]
+    inf = [Int(f"inf_{i}") for i in range(copies)]
+    dist = [[Int(f"dist_{i}_{e}") for e in range(len(edges))] for i in range(copies)]
+    edge_of = {frozenset(edge): e for e, edge in enumerate(edges)}
+    rings = [[edge_of[frozenset((cycle[j], cycle[(j + 1) % len(cycle)]))] for j in range(len(cycle))]
+             for cycle in nx.cycle_basis(nx.Graph(edges))]
 
-    print("No solution.")
-    return None
+    for i in range(copies):
+        s.add(inf[i] >= -1, inf[i] < n)
+        if i > 0:
+            s.add(inf[i - 1] <= inf[i])  # copies are interchangeable
+        for e, (u, v) in enumerate(edges):
+            s.add(If(Or(inf[i] == u, inf[i] == v), dist[i][e] == INF,
+                     And(dist[i][e] >= 1, dist[i][e] <= m // 2)))
+        for ring in rings:
+            ring_vertices = {v for e in ring for v in edges[e]}
+            s.add(Or(Or([inf[i] == v for v in ring_vertices]), Sum([dist[i][e] for e in ring]) % 2 == 0))
 
+    for a in allowed:
+        s.add(Sum([If(d == a, 1, 0) for row in dist for d in row]) == m)
+    return s, inf, dist
 
 
+def _realize_copy(n, edges, m, INF, lengths, inf_vertex, forbidden):
+    """
+    Phase 2: vertex labels of one copy realizing the chosen edge lengths, in a private z3 context
+    so copies can be solved on separate threads. inf_vertex (or -1) is labeled ∞. Edges of the copy
+    that share a length get distinct residue hashes; forbidden[e] lists hashes edge e may not take
+    (used by other copies). Returns the labels, or None if this copy cannot realize its lengths.
+    """
+    ctx = Context()
+    s = Solver(ctx=ctx)
+    label = [Int(f"label_{v}", ctx) for v in range(n)]
+    s.add(Distinct(label))
+    for v in range(n):
+        if v == inf_vertex:
+            s.add(label[v] == INF)
+        else:
+            s.add(label[v] >= 0, label[v] < INF)
+
+    def residue(v):
+        return INF if v == inf_vertex else label[v] % m
+
+    by_length = {}
+    for e, (u, v) in enumerate(edges):
+        if lengths[e] != INF:
+            s.add(Abs(label[u] - label[v]) == lengths[e])
+        h = residue(u) * (m + 1) + residue(v)
+        by_length.setdefault(lengths[e], []).append(h)
+        for value in forbidden.get(e, ()):
+            s.add(h != value)
+    for hashes in by_length.values():
+        if len(hashes) > 1:
+            s.add(Distinct(hashes))
+
+    if s.check() != sat:
+        return None
+    model = s.model()
+    return [model.eval(label[v], model_completion=True).as_long() for v in range(n)]
 
 
+def _residue_collisions(edges, m, INF, dist, values):
+    """Copies whose residue hashes clash with an earlier copy under the same edge label."""
+    seen = {}
+    clashing = set()
+    for i, row in enumerate(values):
+        for e, (u, v) in enumerate(edges):
+            key = (dist[i][e], _residue_hash(row[u], row[v], m, INF))
+            if key in seen and seen[key] != i:
+                clashing.add(i)
+            seen.setdefault(key, i)
+    return clashing
 
 
+def _forbidden_hashes(edges, m, INF, dist, values, copy, fixed):
+    """{edge: hashes used by the fixed copies on edges with the same label as edge in `copy`}."""
+    used = {}
+    for i in fixed:
+        for e, (u, v) in enumerate(edges):
+            used.setdefault(dist[i][e], set()).add(_residue_hash(values[i][u], values[i][v], m, INF))
+    return {e: used.get(dist[copy][e], ()) for e in range(len(edges))}
 
-'''
-    # Solve
-    print("Solving...")
-    if s.check() == sat:
-        print("Solver found a solution.")
-        model = s.model()
-        labeled_copies = []
-        for i in range(k):
-            graph_i = k_copies[i]
-            labels = {v: model[label[i][v]].as_long() for v in graph_i.nodes()}
-            nx.set_node_attributes(graph_i, labels, "label")
-            labeled_copies.append(graph_i)
-
-            # Print labels for debugging
-            print(f"\nGraph {i}:")
-            for v in graph_i.nodes(data=True):
-                print(f"  Node {v[0]}: Label {v[1]['label']}")
-
-            labeled_copies = [rename_nodes_by_labels(g) for g in labeled_copies]
-        return labeled_copies
-    print("No solution found.")
-    return None
-    '''
+
+def labeling_1_rotational_decomposed(graph, p, workers=None, max_rounds=50):
+    """
+    Same labeling as labeling_1_rotational_lambda, solved in two phases:
+    1. choose the edge-label distribution (which copy and edge get which length) with the quotas;
+    2. realize every copy's lengths as vertex labels, each copy its own small model, solved concurrently.
+    Copies whose residues clash with others under the same label are re-solved one at a time with those
+    residue hashes forbidden; if that fails the distribution is blocked and phase 1 picks another.
+    That block is a heuristic (the other copies stay frozen at their first realization), so once one was
+    added an unsat phase 1 proves nothing; then, and after max_rounds distributions, it falls back to the
+    monolithic model, so the answer is always exact.
+    """
+    m = graph.number_of_edges()
+    copies = (m + 1) // 2
+    INF = p * m
+    nodes = list(graph.nodes())
+    index = {v: j for j, v in enumerate(nodes)}
+    edges = [(index[u], index[v]) for u, v in graph.edges()]
+    n = len(nodes)
+    started = time.perf_counter()
+    phase_times = {"distribution": 0.0, "realization": 0.0, "repair": 0.0}
+
+    print("Solving 1-rotational λ_p-labeling (decomposed)...")
+    master, inf_vars, dist_vars = _distribution_model(n, edges, m, INF, copies)
+    heuristic_cut = False
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(max_rounds):
+            t = time.perf_counter()
+            status = master.check()
+            phase_times["distribution"] += time.perf_counter() - t
+            if status == unsat:
+                _report_phase_times(phase_times, started)
+                if heuristic_cut:
+                    print("Distributions exhausted after a heuristic block, falling back to the monolithic model.")
+                    return labeling_1_rotational_lambda(graph, p)
+                print("No solution.")
+                return None
+            model = master.model()
+            dist = [[model[d].as_long() for d in row] for row in dist_vars]
+            inf = [model[v].as_long() for v in inf_vars]
+
+            t = time.perf_counter()
+            values = list(pool.map(lambda i: _realize_copy(n, edges, m, INF, dist[i], inf[i], {}), range(copies)))
+            phase_times["realization"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            clashing = set()
+            if all(row is not None for row in values):
+                clashing = _residue_collisions(edges, m, INF, dist, values)
+                fixed = [i for i in range(copies) if i not in clashing]
+                for i in sorted(clashing):
+                    forbidden = _forbidden_hashes(edges, m, INF, dist, values, i, fixed)
+                    values[i] = _realize_copy(n, edges, m, INF, dist[i], inf[i], forbidden)
+                    if values[i] is None:
+                        break
+                    fixed.append(i)
+            phase_times["repair"] += time.perf_counter() - t
+
+            if all(row is not None for row in values):
+                _report_phase_times(phase_times, started)
+                print("Solution found.\n")
+                return _labeled_copies(graph, np.array(values).reshape(copies, n), INF)
+
+            unrealizable = [i for i in range(copies) if values[i] is None and i not in clashing]
+            if unrealizable:
+                # these lengths cannot be realized by any copy, whatever the residues of the others
+                for i in unrealizable:
+                    for j in range(copies):
+                        master.add(Or([inf_vars[j] != inf[i]] +
+                                      [d != dist[i][e] for e, d in enumerate(dist_vars[j])]))
+            else:
+                # block this distribution and try another; a failed repair does not prove it infeasible
+                heuristic_cut = True
+                master.add(Or([d != model[d] for row in dist_vars for d in row] +
+                              [v != model[v] for v in inf_vars]))
+
+    _report_phase_times(phase_times, started)
+    print(f"No distribution realized after {max_rounds} rounds, falling back to the monolithic model.")
+    return labeling_1_rotational_lambda(graph, p)
+
+
+def _report_phase_times(phase_times, started):
+    parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in phase_times.items())
+    print(f"Decomposed solve: {parts}, total {time.perf_counter() - started:.2f}s")
+
+
+def iter_solutions(graphs, p):
+    """Solve each graph in turn, yielding every LabeledCopies found (for streaming to visualize)."""
+    for graph in graphs:
+        result = labeling_1_rotational_lambda(graph, p)
+        if result is not None:
+            yield result
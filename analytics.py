@@ -0,0 +1,179 @@
+import numpy as np
+import networkx as nx
+from labeled_copies import LabeledCopies, INF_LABEL
+
+COLUMNS = ("solution", "family", "copy", "edge", "u_label", "v_label", "length", "residue", "u_residue", "v_residue")
+
+
+def _edge_columns(u, v, mod, residue_mod):
+    """
+    Edge length, residue (ℓ^* = (f(u) + f(v)) mod residue_mod) and the endpoint residues f mod residue_mod
+    for label arrays u, v; ∞ is INF_LABEL, and an ∞ endpoint keeps INF_LABEL as its residue.
+    """
+    inf_u, inf_v = u == INF_LABEL, v == INF_LABEL
+    diff = np.abs(u - v)
+    if mod is not None:
+        diff = np.minimum(diff, mod - diff)
+    length = np.where(inf_u | inf_v, INF_LABEL, diff)
+    residue = np.where(inf_u, v, np.where(inf_v, u, u + v)) % residue_mod
+    u_residue = np.where(inf_u, INF_LABEL, u % residue_mod)
+    v_residue = np.where(inf_v, INF_LABEL, v % residue_mod)
+    return length, residue, u_residue, v_residue
+
+
+def _as_labeled_copies(item):
+    """A LabeledCopies for item; a drawn graph (nodes named by label, ∞ = math.inf) is one copy."""
+    if isinstance(item, LabeledCopies):
+        return item
+    graph = item if isinstance(item, nx.Graph) else item.to_networkx()
+    labels = [INF_LABEL if node == float("inf") else node for node in graph.nodes()]
+    return LabeledCopies(graph, [labels])
+
+
+def _group_keys(columns):
+    """
+    (distinct key rows, row -> group index) for integer key columns.
+    Keys are packed into one int64 per row (mixed radix) so np.unique sorts a flat array;
+    np.unique(axis=0) is only used when the packed key would overflow.
+    """
+    if not len(columns[0]):
+        return np.zeros((0, len(columns)), dtype=np.int64), np.zeros(0, dtype=np.int64)
+    lows = [int(column.min()) for column in columns]
+    radices = [int(column.max()) - low + 1 for column, low in zip(columns, lows)]
+    if np.prod([float(r) for r in radices]) >= 2 ** 62:
+        groups, inverse = np.unique(np.column_stack(columns), axis=0, return_inverse=True)
+        return groups, inverse.reshape(-1)
+    packed = np.zeros(len(columns[0]), dtype=np.int64)
+    for column, low, radix in zip(columns, lows, radices):
+        packed = packed * radix + (column - low)
+    keys, inverse = np.unique(packed, return_inverse=True)
+    groups = np.empty((len(keys), len(columns)), dtype=np.int64)
+    for i in range(len(columns) - 1, -1, -1):
+        keys, digit = np.divmod(keys, radices[i])
+        groups[:, i] = digit + lows[i]
+    return groups, inverse.reshape(-1)
+
+
+class EdgeTable:
+    """
+    Solved labelings as columns, one row per edge per copy:
+    solution, family (index into `families`), copy, edge, u_label, v_label, length, residue, u_residue, v_residue.
+    length is |f(u) - f(v)| (or min(d, mod - d) when a mod is given), residue is ℓ^* = (f(u) + f(v)) mod m and
+    u_residue / v_residue are f(u) mod m and f(v) mod m, with m the solution's edge count as in CP
+    (or residue_mod when one is given); ∞ is stored as INF_LABEL (-1).
+    """
+
+    def __init__(self, columns, families):
+        self.columns = {name: np.asarray(columns[name]) for name in COLUMNS}
+        self.families = list(families)
+
+    def __len__(self):
+        return len(self.columns["solution"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def where(self, mask):
+        """Rows selected by a boolean mask, as a new table."""
+        return EdgeTable({name: column[mask] for name, column in self.columns.items()}, self.families)
+
+    def family_rows(self, family):
+        return self.where(self.columns["family"] == self.families.index(family))
+
+    # ---- aggregations ------------------------------------------------------------------
+
+    def group_by(self, *keys, value=None):
+        """
+        Group rows by the given columns. Returns columns: the keys, "count", and with value=<column>
+        also "sum", "min", "max" and "mean" of that column per group.
+        """
+        groups, inverse = _group_keys([self.columns[key] for key in keys])
+        result = {key: groups[:, i] for i, key in enumerate(keys)}
+        result["count"] = np.bincount(inverse, minlength=len(groups))
+        if value is not None:
+            values = self.columns[value]
+            result["sum"] = np.bincount(inverse, weights=values, minlength=len(groups))
+            result["mean"] = result["sum"] / result["count"]
+            result["min"] = np.full(len(groups), values.max() if len(values) else 0)
+            result["max"] = np.full(len(groups), values.min() if len(values) else 0)
+            np.minimum.at(result["min"], inverse, values)
+            np.maximum.at(result["max"], inverse, values)
+        return result
+
+    def length_histogram(self, per_family=False):
+        """How often each edge length occurs (overall, or per family)."""
+        return self.group_by("family", "length") if per_family else self.group_by("length")
+
+    def residue_distribution(self, per_family=False):
+        """Counts of each (length, residue) pair (overall, or per family)."""
+        if per_family:
+            return self.group_by("family", "length", "residue")
+        return self.group_by("length", "residue")
+
+    def collisions(self):
+        """
+        (solution, length, u_residue, v_residue) groups holding more than one edge: edges with the same
+        length and the same endpoint residues, the pairs the rotational solver requires to be distinct.
+        """
+        groups = self.group_by("solution", "length", "u_residue", "v_residue")
+        repeated = groups["count"] > 1
+        return {name: column[repeated] for name, column in groups.items()}
+
+    # ---- export ------------------------------------------------------------------------
+
+    def save(self, path):
+        """Columnar binary file (.npz, one array per column) readable with EdgeTable.load."""
+        np.savez(path, families=np.array(self.families, dtype=str), **self.columns)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in COLUMNS}, data["families"].tolist())
+
+    def to_csv(self, path):
+        write_csv(path, self.columns)
+
+
+def write_csv(path, columns):
+    """Write a dict of equal-length columns (a table or a group_by result) as CSV."""
+    names = list(columns)
+    table = np.column_stack([np.asarray(columns[name]) for name in names])
+    fmt = ["%d" if np.issubdtype(np.asarray(columns[name]).dtype, np.integer) else "%.6g" for name in names]
+    np.savetxt(path, table, fmt=fmt, delimiter=",", header=",".join(names), comments="")
+
+
+def load_solutions(solutions, mod=None, residue_mod=None):
+    """
+    Build an EdgeTable from solved labelings.
+    solutions is an iterable of LabeledCopies or drawn graphs, optionally as (family name, solution) pairs.
+    Residues are taken mod each solution's edge count m unless residue_mod is given.
+    All copies of one solution are expanded at once with NumPy; no per-edge Python work.
+    """
+    families = {}
+    parts = []
+    for number, item in enumerate(solutions):
+        family, solution = item if isinstance(item, tuple) else ("", item)
+        solution = _as_labeled_copies(solution)
+        family_id = families.setdefault(family, len(families))
+        labels = solution.labels.astype(np.int64)
+        edges = solution.base.edge_array
+        copies, m = len(labels), len(edges)
+        u, v = labels[:, edges[:, 0]].reshape(-1), labels[:, edges[:, 1]].reshape(-1)
+        length, residue, u_residue, v_residue = _edge_columns(u, v, mod, residue_mod or max(m, 1))
+        parts.append({
+            "solution": np.full(copies * m, number, dtype=np.int64),
+            "family": np.full(copies * m, family_id, dtype=np.int64),
+            "copy": np.repeat(np.arange(copies, dtype=np.int64), m),
+            "edge": np.tile(np.arange(m, dtype=np.int64), copies),
+            "u_label": u,
+            "v_label": v,
+            "length": length,
+            "residue": residue,
+            "u_residue": u_residue,
+            "v_residue": v_residue,
+        })
+    if parts:
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+    else:
+        columns = {name: np.zeros(0, dtype=np.int64) for name in COLUMNS}
+    return EdgeTable(columns, families)
@@ -0,0 +1,71 @@
+import multiprocessing
+import threading
+from labeled_copies import LabeledCopies
+
+DONE = None  # put on the queue after the last graph
+
+
+class WorkerError:
+    """Stands in the queue for an exception raised by the worker."""
+
+    def __init__(self, message):
+        self.message = message
+
+    def __repr__(self):
+        return f"WorkerError({self.message!r})"
+
+
+def _run(out, stop, target, args):
+    try:
+        result = target(*args)
+        if result is not None:
+            for item in ([result] if isinstance(result, LabeledCopies) else result):
+                if stop.is_set():
+                    break
+                if isinstance(item, LabeledCopies):
+                    for i in range(len(item)):
+                        out.put(item.relabeled(i))
+                else:
+                    out.put(item)
+    except Exception as exc:
+        out.put(WorkerError(repr(exc)))
+    finally:
+        out.put(DONE)
+
+
+class BackgroundSolve:
+    """
+    Runs target(*args) in a worker process and streams what it finds through `queue`.
+    target may return a LabeledCopies, a list, or a generator; generators are streamed item by item
+    and every LabeledCopies is sent as its relabeled copies (the graphs visualize draws).
+    The queue ends with DONE (unless the worker had to be terminated, see cancel); pass the object straight to visualize to watch results arrive.
+    target must be a module-level function so it can be sent to the worker.
+    """
+
+    def __init__(self, target, *args):
+        self.queue = multiprocessing.Queue()
+        self.stop = multiprocessing.Event()
+        self.process = multiprocessing.Process(target=_run, args=(self.queue, self.stop, target, args), daemon=True)
+        self.process.start()
+
+    def done(self):
+        return not self.process.is_alive()
+
+    def cancel(self, timeout=2.0):
+        """
+        Ask the worker to stop and return at once, so the UI thread never waits on a solve.
+        The worker checks between items and ends the queue with DONE itself. A helper thread joins it
+        and, only if it has not exited after `timeout` seconds (e.g. still inside one long solve),
+        terminates it. Terminating can leave the queue half-written, so nothing more is put on it then;
+        readers should stop on their own (LiveLayout does, through its stopped event).
+        """
+        if not self.process.is_alive() or self.stop.is_set():
+            return
+        self.stop.set()
+        threading.Thread(target=self._reap, args=(timeout,), daemon=True).start()
+
+    def _reap(self, timeout):
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
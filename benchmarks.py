@@ -0,0 +1,77 @@
+import argparse
+import contextlib
+import io
+import time
+import networkx as nx
+
+
+def _timed(solve, *args, **kwargs):
+    """(seconds, found) for one solver call, with its printing silenced."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = solve(*args, **kwargs)
+    return time.perf_counter() - start, result is not None
+
+
+def rotational_cases(max_edges):
+    """Growing cycles and trees (odd edge counts only; even m has no rotational labeling)."""
+    for m in range(5, max_edges + 1, 2):
+        yield f"C{m}", nx.cycle_graph(m)
+    for m in range(5, max_edges + 1, 2):
+        for k, tree in enumerate(nx.nonisomorphic_trees(m + 1)):
+            if k == 3:
+                break
+            yield f"T{m}.{k}", tree
+
+
+def compare_rotational(cases, p, workers=None, monolithic=True):
+    """Solve every (name, graph) case with the monolithic and decomposed models and print both times."""
+    from CP import labeling_1_rotational_lambda
+    rows = []
+    print(f"{'graph':<8}{'m':>4}{'monolithic':>14}{'decomposed':>14}  found")
+    for name, graph in cases:
+        mono = _timed(labeling_1_rotational_lambda, graph, p) if monolithic else (float("nan"), None)
+        dec = _timed(labeling_1_rotational_lambda, graph, p, decompose=True, workers=workers)
+        rows.append((name, graph.number_of_edges(), mono[0], dec[0], dec[1]))
+        mono_text = f"{mono[0]:.2f}s" if monolithic else "-"
+        print(f"{name:<8}{graph.number_of_edges():>4}{mono_text:>14}{dec[0]:>13.2f}s  {dec[1]}", flush=True)
+    return rows
+
+
+def one_to_k_cases(max_edges):
+    """(name, graph, r) for paths and cycles with odd m, over every r allowed by r^2 ≡ r (mod 2m)."""
+    for m in range(3, max_edges + 1, 2):
+        for name, graph in ((f"P{m + 1}", nx.path_graph(m + 1)), (f"C{m}", nx.cycle_graph(m))):
+            for r in range(2, 2 * m + 2):
+                if (r ** 2) % (2 * m) == r % (2 * m):
+                    yield name, graph, r
+
+
+def scale_1_to_k(cases):
+    """Solve every (name, graph, r) case with labeling_1_to_k and print the time against k and m."""
+    from CP import labeling_1_to_k
+    rows = []
+    print(f"{'graph':<8}{'m':>4}{'r':>4}{'k':>4}{'time':>10}  found")
+    for name, graph, r in cases:
+        seconds, found = _timed(labeling_1_to_k, graph, r)
+        rows.append((name, graph.number_of_edges(), r, r // 2, seconds, found))
+        print(f"{name:<8}{graph.number_of_edges():>4}{r:>4}{r // 2:>4}{seconds:>9.2f}s  {found}", flush=True)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solver timing comparisons.")
+    parser.add_argument("-p", type=int, default=3)
+    parser.add_argument("--max-edges", type=int, default=9)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--skip-monolithic", action="store_true")
+    parser.add_argument("--one-to-k", action="store_true", help="time labeling_1_to_k over k and m instead")
+    args = parser.parse_args(argv)
+    if args.one_to_k:
+        scale_1_to_k(one_to_k_cases(args.max_edges))
+        return
+    compare_rotational(rotational_cases(args.max_edges), args.p, args.workers, not args.skip_monolithic)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import math
+import mmap
+import os
+import numpy as np
+import networkx as nx
+from compact_graph import CompactGraph, INDEX_DTYPE
+
+INDEX_SUFFIX = ".idx"
+OFFSET_DTYPE = np.dtype("<u8")  # one fixed-width little-endian offset per record
+_SIX_BITS = np.array([32, 16, 8, 4, 2, 1], dtype=np.uint8)
+
+
+def _encode_size(n):
+    if n <= 62:
+        return bytes([n + 63])
+    if n <= 258047:
+        return bytes([126] + [((n >> s) & 63) + 63 for s in (12, 6, 0)])
+    return bytes([126, 126] + [((n >> s) & 63) + 63 for s in (30, 24, 18, 12, 6, 0)])
+
+
+def _decode_size(data):
+    """(n, header length) of a graph6 record."""
+    if data[0] != 126:
+        return data[0] - 63, 1
+    if data[1] != 126:
+        digits, start = data[1:4], 4
+    else:
+        digits, start = data[2:8], 8
+    n = 0
+    for d in digits:
+        n = (n << 6) | (d - 63)
+    return n, start
+
+
+def to_graph6(graph):
+    """graph6 bytes (no header, no newline) of a graph, nodes taken in index order."""
+    graph = CompactGraph.from_networkx(graph)
+    n = graph.n
+    u, v = graph.edge_array[:, 0], graph.edge_array[:, 1]
+    i, j = np.minimum(u, v), np.maximum(u, v)
+    keep = i != j  # graph6 has no self-loops
+    nbits = n * (n - 1) // 2
+    bits = np.zeros(-(-nbits // 6) * 6, dtype=np.uint8)
+    bits[(j * (j - 1) // 2 + i)[keep]] = 1
+    body = bits.reshape(-1, 6) @ _SIX_BITS + 63
+    return _encode_size(n) + body.astype(np.uint8).tobytes()
+
+
+def compact_from_graph6(data):
+    """CompactGraph from graph6 bytes, decoded with NumPy instead of per-edge dict inserts."""
+    n, start = _decode_size(data)
+    body = np.frombuffer(data, dtype=np.uint8, offset=start) - 63
+    bits = np.unpackbits(body[:, None], axis=1)[:, 2:].reshape(-1)[:n * (n - 1) // 2]
+    pos = np.flatnonzero(bits).astype(INDEX_DTYPE)
+    # invert pos = j * (j - 1) / 2 + i with 0 <= i < j
+    j = ((1 + np.sqrt(1 + 8 * pos.astype(np.float64))) // 2).astype(INDEX_DTYPE)
+    j[j * (j - 1) // 2 > pos] -= 1
+    j[(j + 1) * j // 2 <= pos] += 1
+    i = pos - j * (j - 1) // 2
+    return CompactGraph(n, np.column_stack((i, j)))
+
+
+def encode(graph):
+    """The shorter of the graph6 and sparse6 encodings of graph."""
+    compact = CompactGraph.from_networkx(graph)
+    record = to_graph6(compact)
+    n, m = compact.n, compact.number_of_edges()
+    k = max(1, math.ceil(math.log2(max(n, 2))))
+    if 2 * m * (k + 1) < n * (n - 1) // 2:  # rough sparse6 size estimate beats graph6
+        sparse = nx.to_sparse6_bytes(nx.convert_node_labels_to_integers(compact.to_networkx()),
+                                     header=False).rstrip(b"\n")
+        if len(sparse) < len(record):
+            record = sparse
+    return record
+
+
+def decode(record, compact=False):
+    if record.startswith(b":"):
+        graph = nx.from_sparse6_bytes(bytes(record))
+        return CompactGraph.from_networkx(graph) if compact else graph
+    graph = compact_from_graph6(bytes(record))
+    return graph if compact else graph.to_networkx()
+
+
+class CatalogWriter:
+    """
+    Appends graphs to a catalog: newline-terminated graph6/sparse6 records in `path`
+    plus the start offset of each record in `path + ".idx"`.
+    Each record is flushed before its offset is written, so the index never points past the data.
+    Opening an existing catalog continues it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = open(path, "ab")
+        self.index = open(path + INDEX_SUFFIX, "ab")
+        # drop a torn last offset left by an interrupted writer, so new entries stay aligned
+        size = self.index.seek(0, os.SEEK_END)
+        self.index.truncate(size - size % OFFSET_DTYPE.itemsize)
+        self.offset = self.data.seek(0, os.SEEK_END)
+        self.count = 0
+
+    def append(self, graph):
+        record = encode(graph) + b"\n"
+        self.data.write(record)
+        self.data.flush()  # the record reaches the file before its offset can
+        self.index.write(OFFSET_DTYPE.type(self.offset).tobytes())
+        self.offset += len(record)
+        self.count += 1
+
+    def extend(self, graphs):
+        for graph in graphs:
+            self.append(graph)
+
+    def close(self):
+        # flush data before index; readers also skip index entries past the end of the data
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_catalog(path, graphs):
+    """Stream graphs (any iterable or generator) into the catalog at path; returns the number written."""
+    with CatalogWriter(path) as writer:
+        writer.extend(graphs)
+        return writer.count
+
+
+class Catalog:
+    """
+    Read-only view of a catalog. The data file is memory-mapped and the index is a NumPy
+    memmap, so opening is O(1) and catalog[i] reads only record i.
+    Items are nx.Graph, or CompactGraph when opened with compact=True.
+    """
+
+    def __init__(self, path, compact=False):
+        self.path = path
+        self.compact = compact
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        index_path = path + INDEX_SUFFIX
+        if not os.path.exists(index_path):
+            self._file.close()
+            raise FileNotFoundError(f"catalog index {index_path} is missing; copy it along with {path}")
+        count = os.path.getsize(index_path) // OFFSET_DTYPE.itemsize  # a torn last entry is dropped
+        if count:
+            offsets = np.memmap(index_path, dtype=OFFSET_DTYPE, mode="r", shape=(count,))
+            # ignore index entries whose record never reached the data file (interrupted writer)
+            self.offsets = offsets[:np.searchsorted(offsets, size)]
+        else:
+            self.offsets = np.zeros(0, dtype=OFFSET_DTYPE)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def record(self, i):
+        """Raw graph6/sparse6 bytes of record i."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start = int(self.offsets[i])
+        end = self._data.find(b"\n", start)
+        if end < 0:
+            raise IndexError(f"record {i} is incomplete")
+        return self._data[start:end]
+
+    def __getitem__(self, i):
+        return decode(self.record(i), self.compact)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,314 @@
+import numpy as np
+import networkx as nx
+
+INDEX_DTYPE = np.int64
+
+
+def _build_csr(n, edges):
+    """Build (indptr, indices) for an undirected edge array of shape (m, 2)."""
+    src = np.concatenate((edges[:, 0], edges[:, 1]))
+    dst = np.concatenate((edges[:, 1], edges[:, 0]))
+    order = np.argsort(src, kind="stable")
+    indices = dst[order]
+    indptr = np.zeros(n + 1, dtype=INDEX_DTYPE)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, indices
+
+
+def _dedupe_edges(edges):
+    """Drop repeated undirected edges, keeping the first occurrence and its orientation."""
+    if len(edges) == 0:
+        return edges
+    lo = np.minimum(edges[:, 0], edges[:, 1])
+    hi = np.maximum(edges[:, 0], edges[:, 1])
+    key = lo * (int(hi.max()) + 1) + hi
+    _, first = np.unique(key, return_index=True)
+    if len(first) == len(edges):
+        return edges
+    return edges[np.sort(first)]
+
+
+def _induced_subgraph(n, edge_array, keep, labels):
+    """CompactGraph induced by the sorted node indices `keep`, renumbered 0..len(keep)-1."""
+    remap = np.full(n, -1, dtype=INDEX_DTYPE)
+    remap[keep] = np.arange(len(keep), dtype=INDEX_DTYPE)
+    mapped = remap[edge_array]
+    return CompactGraph(len(keep), mapped[(mapped >= 0).all(axis=1)], labels)
+
+
+class CompactGraph:
+    """
+    Undirected graph stored as NumPy arrays instead of networkx dicts.
+    Nodes are indexed 0..n-1; `labels` optionally maps each index to the original node name.
+    - edge_array: int array of shape (m, 2) holding node indices.
+    - indptr, indices: CSR adjacency, neighbors of i are indices[indptr[i]:indptr[i + 1]].
+    The read-only part of the networkx API used by CP.py and graph_visualization.py
+    (nodes, edges, neighbors, number_of_edges, ...) is provided so it can be passed in directly.
+    """
+    __slots__ = ("n", "edge_array", "indptr", "indices", "labels", "_index")
+
+    def __init__(self, n, edge_array, labels=None):
+        self.n = int(n)
+        self.edge_array = np.asarray(edge_array, dtype=INDEX_DTYPE).reshape(-1, 2)
+        self.indptr, self.indices = _build_csr(self.n, self.edge_array)
+        self.labels = tuple(labels) if labels is not None else None
+        self._index = None
+
+    # ---- construction ----------------------------------------------------------------
+
+    @classmethod
+    def build(cls, vertices, edges):
+        """
+        Create a compact graph from a list of vertices and edges.
+        build([u,v,w,...], [(u, v), (w, v), ...])
+        """
+        labels = list(dict.fromkeys(vertices))
+        index = {v: i for i, v in enumerate(labels)}
+        pairs = []
+        for u, v in edges:
+            for node in (u, v):
+                if node not in index:
+                    index[node] = len(labels)
+                    labels.append(node)
+            pairs.append((index[u], index[v]))
+        edge_array = _dedupe_edges(np.array(pairs, dtype=INDEX_DTYPE).reshape(-1, 2))
+        if labels == list(range(len(labels))):
+            labels = None
+        return cls(len(index), edge_array, labels)
+
+    @classmethod
+    def from_networkx(cls, graph):
+        if isinstance(graph, cls):
+            return graph
+        return cls.build(graph.nodes(), graph.edges())
+
+    @classmethod
+    def path(cls, path_graph):
+        """Path through the given nodes in order; an int n gives the path on 0..n-1."""
+        labels = None if isinstance(path_graph, int) else list(path_graph)
+        n = path_graph if labels is None else len(labels)
+        idx = np.arange(n, dtype=INDEX_DTYPE)
+        return cls(n, np.column_stack((idx[:-1], idx[1:])), labels)
+
+    @classmethod
+    def cycle(cls, cycle_graph):
+        """Cycle through the given nodes in order; an int n gives the cycle on 0..n-1."""
+        labels = None if isinstance(cycle_graph, int) else list(cycle_graph)
+        n = cycle_graph if labels is None else len(labels)
+        idx = np.arange(n, dtype=INDEX_DTYPE)
+        return cls(n, _dedupe_edges(np.column_stack((idx, np.roll(idx, -1)))), labels)
+
+    @classmethod
+    def star(cls, hub, neighbors):
+        leaves = list(neighbors)
+        n = len(leaves) + 1
+        edge_array = np.column_stack((np.zeros(n - 1, dtype=INDEX_DTYPE), np.arange(1, n, dtype=INDEX_DTYPE)))
+        return cls(n, edge_array, [hub] + leaves)
+
+    @classmethod
+    def complete(cls, n):
+        """Complete graph K_n on 0..n-1, each edge stored once."""
+        u, v = np.triu_indices(n, k=1)
+        return cls(n, np.column_stack((u, v)))
+
+    @classmethod
+    def merge(cls, *graphs):
+        """Union of graphs, identifying nodes with equal names (like main.merge)."""
+        vertices = []
+        edges = []
+        for graph in graphs:
+            vertices.extend(graph.nodes())
+            edges.extend(graph.edges())
+        return cls.build(vertices, edges)
+
+    # ---- conversion ------------------------------------------------------------------
+
+    def to_networkx(self):
+        graph = nx.Graph()
+        graph.add_nodes_from(self.nodes())
+        graph.add_edges_from(self.edges())
+        return graph
+
+    def copy(self):
+        """Shallow copy sharing the (never mutated) arrays."""
+        other = CompactGraph.__new__(CompactGraph)
+        other.n = self.n
+        other.edge_array = self.edge_array
+        other.indptr = self.indptr
+        other.indices = self.indices
+        other.labels = self.labels
+        other._index = self._index
+        return other
+
+    def disjoint_union(self, k):
+        """Zero-copy view of k disjoint copies of this graph."""
+        return DisjointUnion(self, k)
+
+    # ---- networkx-style read API ------------------------------------------------------
+
+    def index_of(self, node):
+        """Index of a node name."""
+        if self.labels is None:
+            return node
+        if self._index is None:
+            self._index = {v: i for i, v in enumerate(self.labels)}
+        return self._index[node]
+
+    def number_of_nodes(self):
+        return self.n
+
+    def number_of_edges(self):
+        return len(self.edge_array)
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return iter(self.nodes())
+
+    def __contains__(self, node):
+        try:
+            i = self.index_of(node)
+        except (KeyError, TypeError):
+            return False
+        return isinstance(i, (int, np.integer)) and 0 <= i < self.n
+
+    def nodes(self):
+        return range(self.n) if self.labels is None else self.labels
+
+    def edges(self):
+        if self.labels is None:
+            return [tuple(e) for e in self.edge_array.tolist()]
+        labels = self.labels
+        return [(labels[u], labels[v]) for u, v in self.edge_array.tolist()]
+
+    def neighbor_indices(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def neighbors(self, node):
+        nbrs = self.neighbor_indices(self.index_of(node)).tolist()
+        if self.labels is None:
+            return iter(nbrs)
+        return iter([self.labels[j] for j in nbrs])
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def component_ids(self):
+        """Component id (smallest node index in it) for every node, by vectorized label propagation."""
+        comp = np.arange(self.n, dtype=INDEX_DTYPE)
+        if len(self.edge_array) == 0:
+            return comp
+        u, v = self.edge_array[:, 0], self.edge_array[:, 1]
+        while True:
+            low = np.minimum(comp[u], comp[v])
+            new = comp.copy()
+            np.minimum.at(new, u, low)
+            np.minimum.at(new, v, low)
+            new = new[new]  # pointer jumping
+            if np.array_equal(new, comp):
+                return comp
+            comp = new
+
+    def connected_components(self):
+        """List of node-name sets, in the same form as nx.connected_components."""
+        comp = self.component_ids()
+        names = self.nodes()
+        components = {}
+        for i, c in enumerate(comp.tolist()):
+            components.setdefault(c, set()).add(names[i])
+        return list(components.values())
+
+    def subgraph(self, nodes):
+        """Induced subgraph on the given node names, as a new CompactGraph."""
+        keep = np.array(sorted(self.index_of(v) for v in nodes), dtype=INDEX_DTYPE)
+        names = self.nodes()
+        return _induced_subgraph(self.n, self.edge_array, keep, [names[i] for i in keep.tolist()])
+
+    def __repr__(self):
+        return f"CompactGraph(n={self.n}, m={self.number_of_edges()})"
+
+
+class DisjointUnion:
+    """
+    k disjoint copies of a CompactGraph without materializing them.
+    Node j of copy i has index i * n + j (the numbering of nx.disjoint_union_all).
+    """
+    __slots__ = ("base", "k")
+
+    def __init__(self, base, k):
+        self.base = base
+        self.k = int(k)
+
+    def copy_of(self, i):
+        """The base graph standing in for copy i (shared, not copied)."""
+        if not 0 <= i < self.k:
+            raise IndexError(i)
+        return self.base
+
+    def number_of_nodes(self):
+        return self.k * self.base.n
+
+    def number_of_edges(self):
+        return self.k * self.base.number_of_edges()
+
+    def __len__(self):
+        return self.number_of_nodes()
+
+    def __iter__(self):
+        return iter(self.nodes())
+
+    def nodes(self):
+        return range(self.number_of_nodes())
+
+    def edge_array(self, i=None):
+        """Edges of copy i (or all copies, stacked) as offset node indices."""
+        base = self.base.edge_array
+        if i is not None:
+            return base + i * self.base.n
+        offsets = np.arange(self.k, dtype=INDEX_DTYPE)[:, None, None] * self.base.n
+        return (base[None, :, :] + offsets).reshape(-1, 2)
+
+    def edges(self):
+        n = self.base.n
+        base = self.base.edge_array.tolist()
+        return [(u + i * n, v + i * n) for i in range(self.k) for u, v in base]
+
+    def neighbors(self, node):
+        i, j = divmod(node, self.base.n)
+        return iter((self.base.neighbor_indices(j) + i * self.base.n).tolist())
+
+    def component_ids(self):
+        base = self.base.component_ids()
+        return (base[None, :] + np.arange(self.k, dtype=INDEX_DTYPE)[:, None] * self.base.n).reshape(-1)
+
+    def connected_components(self):
+        n = self.base.n
+        base = [{self.base.index_of(v) for v in c} for c in self.base.connected_components()]
+        return [{j + i * n for j in c} for i in range(self.k) for c in base]
+
+    def subgraph(self, nodes):
+        """Induced subgraph; only the base edges are touched when the nodes lie in one copy."""
+        n = self.base.n
+        keep = np.array(sorted(nodes), dtype=INDEX_DTYPE)
+        copies = np.unique(keep // n) if n else keep
+        if len(copies) == 1:
+            offset = int(copies[0]) * n
+            return _induced_subgraph(n, self.base.edge_array, keep - offset, keep.tolist())
+        return _induced_subgraph(self.number_of_nodes(), self.edge_array(), keep, keep.tolist())
+
+    def to_compact(self):
+        return CompactGraph(self.number_of_nodes(), self.edge_array())
+
+    def to_networkx(self):
+        return self.to_compact().to_networkx()
+
+    def __repr__(self):
+        return f"DisjointUnion({self.base!r}, k={self.k})"
+
+
+def as_networkx(graph):
+    """Return graph as an nx.Graph, converting compact graphs."""
+    if isinstance(graph, nx.Graph):
+        return graph
+    return graph.to_networkx()
@@ -0,0 +1,93 @@
+import cProfile
+import os
+import time
+import tracemalloc
+from collections import deque
+
+
+class FrameProfiler:
+    """
+    Low-overhead per-stage frame timer for the visualize loop.
+    Call begin_frame() at the top of a frame and mark(stage) after each stage; the time since the
+    previous mark is charged to that stage. Averages are kept over the last `window` frames.
+    Does nothing while disabled.
+    """
+
+    def __init__(self, enabled=False, window=60):
+        self.enabled = enabled
+        self.window = window
+        self.frame_times = deque(maxlen=window)
+        self.stage_times = {}
+        self._frame_start = None
+        self._last = None
+        self._profile = None
+
+    def toggle(self):
+        """Switch on or off; samples from before the switch are dropped so they do not skew the averages."""
+        self.enabled = not self.enabled
+        self._frame_start = None
+        self._last = None
+        self.frame_times.clear()
+        for times in self.stage_times.values():
+            times.clear()
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_times.append(now - self._frame_start)
+        self._frame_start = self._last = now
+
+    def mark(self, stage):
+        if not self.enabled or self._last is None:
+            return
+        now = time.perf_counter()
+        times = self.stage_times.get(stage)
+        if times is None:
+            times = self.stage_times[stage] = deque(maxlen=self.window)
+        times.append(now - self._last)
+        self._last = now
+
+    def fps(self):
+        if not self.frame_times:
+            return 0.0
+        return len(self.frame_times) / sum(self.frame_times)
+
+    def stage_ms(self):
+        """{stage: mean milliseconds per frame}, in first-seen order."""
+        return {stage: 1000 * sum(times) / len(times) for stage, times in self.stage_times.items() if times}
+
+    def overlay_lines(self):
+        lines = [f"FPS {self.fps():.1f}"]
+        lines += [f"{stage}: {ms:.2f} ms" for stage, ms in self.stage_ms().items()]
+        if self._profile is not None:
+            lines.append("cProfile recording (F4 to save)")
+        if tracemalloc.is_tracing():
+            lines.append("tracemalloc on (F5 to save)")
+        return lines
+
+    # ---- dumps ----------------------------------------------------------------------------
+
+    def toggle_cprofile(self, directory):
+        """Start recording with cProfile, or stop and write a .prof file; returns the path written."""
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            return None
+        self._profile.disable()
+        path = os.path.join(directory, f"visualize_{time.strftime('%Y%m%d_%H%M%S')}.prof")
+        self._profile.dump_stats(path)
+        self._profile = None
+        print(f"cProfile stats saved to {path}")
+        return path
+
+    def tracemalloc_snapshot(self, directory):
+        """Start tracemalloc, or write a snapshot if it is already tracing; returns the path written."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            return None
+        path = os.path.join(directory, f"visualize_{time.strftime('%Y%m%d_%H%M%S')}.tracemalloc")
+        tracemalloc.take_snapshot().dump(path)
+        print(f"tracemalloc snapshot saved to {path}")
+        return path
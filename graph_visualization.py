@@ -2,12 +2,31 @@ import pygame
 import networkx as nx
 import os
 import math
+import queue
+import threading
+import time
+import functools
+import numpy as np
+import concurrent.futures
+from compact_graph import CompactGraph, DisjointUnion
+from labeled_copies import LabeledCopies
+from background import BackgroundSolve, WorkerError, DONE
+from frame_profiler import FrameProfiler
 
 # Updated constants for new left tab width
 NEW_LEFT_TAB_WIDTH = 350  # New width for the left tab
 DEFAULT_WIDTH, DEFAULT_HEIGHT = 1200, 800
 RIGHT_TAB_WIDTH = 200
 MARGIN = 20  # Margin for better spacing
+LIVE_SECTION_HEIGHT = 150  # Height given to each graph when graphs stream in from a live source
+
+# Level of detail: labels are skipped once zoom * vertex size drops below these scales
+EDGE_LABEL_MIN_SCALE = 0.75
+VERTEX_SUBLABEL_MIN_SCALE = 0.6
+VERTEX_LABEL_MIN_SCALE = 0.4
+CULL_PADDING = 40  # Screen pixels kept around the viewport so labels beside visible nodes still show
+OVERLAY_REFRESH = 0.25  # Seconds between profiler overlay redraws
+_overlay = {"at": 0.0, "surface": None}  # Last rendered profiler overlay
 DARK_GREEN = (0, 128, 0)
 
 # New grid toggle state
@@ -67,13 +86,123 @@ def arrange_tree(tree, pos, start_x, start_y, x_spacing=50, y_spacing=50):
     return pos
 
 
-# Function to draw the graph with labels
-def draw_graph(mod, screen, G, pos, show_vertex_labels, show_vertex_sublabels, show_edge_labels, show_edge_sublabels,
-               vertex_scale):
-    for edge in G.edges():
-        pygame.draw.line(screen, (200, 200, 200), pos[edge[0]], pos[edge[1]], int(2 * vertex_scale))  # GRAY
+class Camera:
+    """Pan/zoom of the graph area: screen = (world - offset) * zoom. Node positions stay in world coordinates."""
+    __slots__ = ("offset_x", "offset_y", "zoom")
+    MIN_ZOOM, MAX_ZOOM = 0.05, 20.0
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.offset_x, self.offset_y, self.zoom = 0.0, 0.0, 1.0
+
+    def to_screen(self, x, y):
+        return (x - self.offset_x) * self.zoom, (y - self.offset_y) * self.zoom
+
+    def to_world(self, x, y):
+        return x / self.zoom + self.offset_x, y / self.zoom + self.offset_y
+
+    def pan(self, dx, dy):
+        """Move the view by a screen-space distance."""
+        self.offset_x -= dx / self.zoom
+        self.offset_y -= dy / self.zoom
+
+    def zoom_at(self, x, y, factor):
+        """Zoom by factor keeping the world point under screen point (x, y) fixed."""
+        world_x, world_y = self.to_world(x, y)
+        self.zoom = min(max(self.zoom * factor, self.MIN_ZOOM), self.MAX_ZOOM)
+        self.offset_x = world_x - x / self.zoom
+        self.offset_y = world_y - y / self.zoom
+
+
+
+class DrawnGraph:
+    """
+    Per-graph drawing state built once at layout time: node order, edge index pairs and the world
+    positions as an (n, 2) array with its bounding box, so draw_graph can reject an off-screen graph
+    in O(1) and otherwise works on arrays. pos is the {node: (x, y)} dict generate_latex and the
+    hit tests use; move_node and translate keep it, the array and the box in step.
+    """
+    __slots__ = ("G", "pos", "nodes", "index", "edges", "edge_index", "world", "lo", "hi")
+
+    def __init__(self, G, pos):
+        self.G = G
+        self.pos = pos
+        self.nodes = list(G.nodes())
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.edges = list(G.edges())
+        self.edge_index = np.array([(self.index[x], self.index[y]) for x, y in self.edges],
+                                   dtype=np.int64).reshape(-1, 2)
+        self.world = np.array([pos[node] for node in self.nodes], dtype=float).reshape(-1, 2)
+        self._update_box()
+
+    def _update_box(self):
+        if len(self.world):
+            self.lo, self.hi = self.world.min(axis=0), self.world.max(axis=0)
+        else:
+            self.lo = self.hi = None
+
+    def move_node(self, node, x, y):
+        self.pos[node] = (x, y)
+        self.world[self.index[node]] = (x, y)
+        self._update_box()
+
+    def translate(self, dx, dy):
+        for node, (x, y) in self.pos.items():
+            self.pos[node] = (x + dx, y + dy)
+        self.world += (dx, dy)
+        if self.lo is not None:
+            self.lo, self.hi = self.lo + (dx, dy), self.hi + (dx, dy)
+
+
+# Fonts and rendered labels are cached; SysFont lookups per edge dominated the frame time
+@functools.lru_cache(maxsize=None)
+def get_font(size, name='Arial'):
+    return pygame.font.SysFont(name, max(1, size))
+
+
+@functools.lru_cache(maxsize=4096)
+def render_text(text, size, color):
+    return get_font(size).render(text, True, color)
+
+
+# Function to draw the graph with labels, culled to the viewport and with level-of-detail labels
+def draw_graph(mod, screen, drawing, show_vertex_labels, show_vertex_sublabels, show_edge_labels,
+               show_edge_sublabels, vertex_scale, camera=None, viewport=None):
+    camera = camera or Camera()
+    viewport = viewport or screen.get_rect()
+    if drawing.lo is None:
+        return
+
+    offset = (camera.offset_x, camera.offset_y)
+    left, top = viewport.left - CULL_PADDING, viewport.top - CULL_PADDING
+    right, bottom = viewport.right + CULL_PADDING, viewport.bottom + CULL_PADDING
+    lo, hi = (drawing.lo - offset) * camera.zoom, (drawing.hi - offset) * camera.zoom
+    if hi[0] < left or lo[0] > right or hi[1] < top or lo[1] > bottom:
+        return  # whole graph off-screen, before any per-node work
+
+    nodes, edges, edge_index = drawing.nodes, drawing.edges, drawing.edge_index
+    xy = (drawing.world - offset) * camera.zoom
+
+    scale = camera.zoom * vertex_scale
+    draw_edge_labels = show_edge_labels and scale >= EDGE_LABEL_MIN_SCALE
+    draw_edge_sublabels = show_edge_sublabels and scale >= EDGE_LABEL_MIN_SCALE
+    draw_vertex_labels = show_vertex_labels and scale >= VERTEX_LABEL_MIN_SCALE
+    draw_vertex_sublabels = show_vertex_sublabels and scale >= VERTEX_SUBLABEL_MIN_SCALE
+    font_size, sub_font_size = int(12 * scale), int(10 * scale)
+
+    p, q = xy[edge_index[:, 0]], xy[edge_index[:, 1]]
+    visible_edges = ((np.minimum(p[:, 0], q[:, 0]) <= right) & (np.maximum(p[:, 0], q[:, 0]) >= left) &
+                     (np.minimum(p[:, 1], q[:, 1]) <= bottom) & (np.maximum(p[:, 1], q[:, 1]) >= top))
+
+    for k in np.flatnonzero(visible_edges).tolist():
+        start, end = p[k].tolist(), q[k].tolist()
+        pygame.draw.line(screen, (200, 200, 200), start, end, max(1, int(2 * scale)))  # GRAY
+        if not (draw_edge_labels or draw_edge_sublabels):
+            continue
         # Calculate edge label
-        x, y = edge
+        x, y = edges[k]
         l_e = "∞" if x == math.inf or y == math.inf else min(abs(x - y), mod - abs(x - y))
         if x == math.inf:
             l_mod_7 = y % 7
@@ -82,52 +211,54 @@ def draw_graph(mod, screen, G, pos, show_vertex_labels, show_vertex_sublabels, s
         else:
             l_mod_7 = (x + y) % 7
 
-        mid_x = (pos[edge[0]][0] + pos[edge[1]][0]) / 2
-        mid_y = (pos[edge[0]][1] + pos[edge[1]][1]) / 2
-        angle = math.atan2(pos[edge[1]][1] - pos[edge[0]][1], pos[edge[0]][0] - pos[edge[1]][0])
+        mid_x = (start[0] + end[0]) / 2
+        mid_y = (start[1] + end[1]) / 2
+        angle = math.atan2(end[1] - start[1], start[0] - end[0])
         angle_deg = math.degrees(angle)
 
         if angle_deg < -90 or angle_deg > 90:
             angle_deg += 180
             angle_deg %= 360
 
-        font = pygame.font.SysFont('Arial', int(12 * vertex_scale))
-        sub_font = pygame.font.SysFont('Arial', int(10 * vertex_scale))
-
-        if show_edge_labels:
-            text = font.render(str(l_e), True, DARK_GREEN)  # DARK_GREEN
+        if draw_edge_labels:
+            text = render_text(str(l_e), font_size, DARK_GREEN)  # DARK_GREEN
             text = pygame.transform.rotate(text, -angle_deg)
             text_rect = text.get_rect(center=(mid_x, mid_y))
             screen.blit(text, text_rect.topleft)
 
-        if show_edge_sublabels:
-            sub_text = sub_font.render(str(l_mod_7), True, (255, 0, 0))  # RED
+        if draw_edge_sublabels:
+            sub_text = render_text(str(l_mod_7), sub_font_size, (255, 0, 0))  # RED
             sub_text = pygame.transform.rotate(sub_text, -angle_deg)
             sub_text_rect = sub_text.get_rect(center=(mid_x, mid_y))
-            if show_edge_labels:
+            if draw_edge_labels:
                 screen.blit(sub_text, (text_rect.right - 5, text_rect.bottom - 5))
             else:
                 screen.blit(sub_text, sub_text_rect.topleft)
 
-    for node in G.nodes():
-        pygame.draw.circle(screen, (0, 0, 255), (int(pos[node][0]), int(pos[node][1])), int(5 * vertex_scale))  # BLUE
+    visible_nodes = (xy[:, 0] >= left) & (xy[:, 0] <= right) & (xy[:, 1] >= top) & (xy[:, 1] <= bottom)
+    radius = max(1, int(5 * scale))
+    label_dx, label_dy = 8 * scale, 5 * scale
+
+    for k in np.flatnonzero(visible_nodes).tolist():
+        node = nodes[k]
+        node_x, node_y = xy[k].tolist()
+        pygame.draw.circle(screen, (0, 0, 255), (int(node_x), int(node_y)), radius)  # BLUE
         # Draw custom node labels with subscript
         node_label = "∞" if node == math.inf else str(node % mod)
         sub_label = "" if node == math.inf else str(node % 7)
-        font = pygame.font.SysFont('Arial', int(12 * vertex_scale))
-        sub_font = pygame.font.SysFont('Arial', int(10 * vertex_scale))
 
-        if show_vertex_labels:
-            text = font.render(node_label, True, (0, 0, 0))  # BLACK
+        if draw_vertex_labels:
+            text = render_text(node_label, font_size, (0, 0, 0))  # BLACK
             text_rect = text.get_rect()
-            screen.blit(text, (pos[node][0] + 8, pos[node][1] - 5))  # Moved the label beside the node
+            screen.blit(text, (node_x + label_dx, node_y - label_dy))  # Moved the label beside the node
 
-        if show_vertex_sublabels and sub_label:
-            sub_text = sub_font.render(sub_label, True, (255, 0, 0))  # RED
-            if show_vertex_labels:
-                screen.blit(sub_text, (pos[node][0] + 8 + text_rect.width - 2, pos[node][1] - 5 + text_rect.height - 2))
+        if draw_vertex_sublabels and sub_label:
+            sub_text = render_text(sub_label, sub_font_size, (255, 0, 0))  # RED
+            if draw_vertex_labels:
+                screen.blit(sub_text, (node_x + label_dx + text_rect.width - 2,
+                                       node_y - label_dy + text_rect.height - 2))
             else:
-                screen.blit(sub_text, (pos[node][0] + 8, pos[node][1] - 5))
+                screen.blit(sub_text, (node_x + label_dx, node_y - label_dy))
 
 
 def draw_boxes_and_charts(screen, all_graph_data, scale_factor):
@@ -210,11 +341,11 @@ def draw_boxes_and_charts(screen, all_graph_data, scale_factor):
         start_y = max(chart_start_y + 40 + max_rows * int(30 * scale_factor) + 10, start_y + cell_size * 3 + 10)
 
 
-# Function to draw the grid
-def draw_grid(screen, width, height, spacing_x, spacing_y):
-    for x in range(0, width, spacing_x):
+# Function to draw the grid, starting at screen offset (origin_x, origin_y)
+def draw_grid(screen, width, height, spacing_x, spacing_y, origin_x=0, origin_y=0):
+    for x in range(int(origin_x) % spacing_x, width, spacing_x):
         pygame.draw.line(screen, (200, 200, 200), (x, 0), (x, height))
-    for y in range(0, height, spacing_y):
+    for y in range(int(origin_y) % spacing_y, height, spacing_y):
         pygame.draw.line(screen, (200, 200, 200), (0, y), (width, y))
 
 
@@ -288,44 +419,203 @@ def generate_latex(mod, pos_list, graphs, location, name, show_vertex_labels, sh
     print(f"LaTeX code saved to {os.path.join(output_dir, f'{name}.tex')}")
 
 
-def visualize(mod, graphs, name, location="default"):
-    global show_grid  # Declare the variable as global
-    pygame.init()
-    WIDTH, HEIGHT = DEFAULT_WIDTH, DEFAULT_HEIGHT
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Interactive Draggable Graphs")
+# Function to lay out one graph, one row of components per 3 components, starting at start_y
+def layout_graph(G, start_y, x_spacing=50, y_spacing=50):
+    component_spacing = 50  # Increased spacing between components
+    vertical_spacing = 75  # Spacing between rows of components
 
-    num_graphs = len(graphs)
-    section_height = HEIGHT // num_graphs
+    if isinstance(G, (CompactGraph, DisjointUnion)):
+        components = G.connected_components()
+    elif isinstance(G, nx.Graph):
+        components = list(nx.connected_components(G))
+    else:
+        print(f"Error: Expected a networkx or compact graph but got {type(G)}")
+        return None
+
+    pos = {}
+    component_start_x = NEW_LEFT_TAB_WIDTH + MARGIN
+
+    for j, component in enumerate(components):
+        if j > 0 and j % 3 == 0:  # Move to next row after every 3 components
+            component_start_x = NEW_LEFT_TAB_WIDTH + MARGIN
+            start_y += vertical_spacing
+        subgraph = G.subgraph(component)
+        arrange_tree(subgraph, pos, component_start_x, start_y, x_spacing, y_spacing)
+        max_x = max(pos[node][0] for node in component)
+        component_start_x = max_x + component_spacing  # Add spacing for next component
+
+    return pos
 
+
+# Function to lay out all graphs, each in its own horizontal section of the window
+def layout_graphs(graphs, height=DEFAULT_HEIGHT):
+    section_height = height // max(len(graphs), 1)
     pos_list = []
-    x_spacing, y_spacing = 50, 50  # Default node spacing
-    component_spacing = 50  # Increased spacing between components
-    vertical_spacing = 75  # Spacing between rows of components
 
     for i, G in enumerate(graphs):
         # Debug information
         print(f"Graph {i}: Type {type(G)}, Value {G}")
+        pos = layout_graph(G, i * section_height + MARGIN)
+        if pos is not None:
+            pos_list.append(pos)
+
+    return pos_list
+
+
+# Function to draw the profiling overlay (FPS and per-stage frame times)
+# The overlay is re-rendered only every OVERLAY_REFRESH seconds (its numbers are averages anyway)
+def draw_profiler_overlay(screen, profiler):
+    now = time.perf_counter()
+    if _overlay["surface"] is None or now - _overlay["at"] >= OVERLAY_REFRESH:
+        font = get_font(14, 'Consolas')
+        lines = [font.render(line, True, (255, 255, 255)) for line in profiler.overlay_lines()]
+        width = max(text.get_width() for text in lines) + 2 * 6
+        height = sum(text.get_height() for text in lines) + 2 * 6
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        y = 6
+        for text in lines:
+            surface.blit(text, (6, y))
+            y += text.get_height()
+        _overlay.update(at=now, surface=surface)
+    screen.blit(_overlay["surface"], (NEW_LEFT_TAB_WIDTH + MARGIN, MARGIN))
+
+
+# Function to collect the edge lengths and l mod 7 values shown in the left tab
+def graph_chart_data(mod, G):
+    edge_lengths = []
+    l_mod_7_values = {8: [], 9: [], 10: [], '∞': []}
 
-        if not isinstance(G, nx.Graph):
-            print(f"Error: Expected a networkx graph but got {type(G)}")
-            continue
-
-        pos = {}
-        start_y = i * section_height + MARGIN
-        components = list(nx.connected_components(G))
-        component_start_x = NEW_LEFT_TAB_WIDTH + MARGIN
-
-        for j, component in enumerate(components):
-            if j > 0 and j % 3 == 0:  # Move to next row after every 3 components
-                component_start_x = NEW_LEFT_TAB_WIDTH + MARGIN
-                start_y += vertical_spacing
-            subgraph = G.subgraph(component)
-            arrange_tree(subgraph, pos, component_start_x, start_y, x_spacing, y_spacing)
-            max_x = max(pos[node][0] for node in component)
-            component_start_x = max_x + component_spacing  # Add spacing for next component
+    for edge in G.edges():
+        x, y = edge
+        l_e = "∞" if x == math.inf or y == math.inf else min(abs(x - y), mod - abs(x - y))
 
-        pos_list.append(pos)
+        if x == math.inf:
+            l_mod_7 = y % 7
+        elif y == math.inf:
+            l_mod_7 = x % 7
+        else:
+            l_mod_7 = (x + y) % 7
+        edge_lengths.append(l_e)
+        if l_e in l_mod_7_values:
+            l_mod_7_values[l_e].append(l_mod_7)
+        else:
+            l_mod_7_values[l_e] = [l_mod_7]
+    return {'T': edge_lengths, 'l_mod_7_values': l_mod_7_values}
+
+
+def _expand(item):
+    """Graphs to draw for one streamed item (a LabeledCopies stands for all its copies)."""
+    if isinstance(item, LabeledCopies):
+        return item.relabeled_graphs()
+    return [item]
+
+
+class LiveLayout(threading.Thread):
+    """
+    Reads graphs from a live source and lays them out off the UI thread.
+    The source is a queue (ending with DONE), a Future whose result is a list or LabeledCopies,
+    or any other iterator of graphs. Each finished (DrawnGraph, chart data) goes to `ready`.
+    """
+
+    def __init__(self, mod, source):
+        super().__init__(daemon=True)
+        self.mod = mod
+        self.source = source
+        self.ready = queue.Queue()
+        self.finished = threading.Event()
+        self.stopped = threading.Event()
+        self.error = None
+        self.count = 0
+
+    def _items(self):
+        if isinstance(self.source, concurrent.futures.Future):
+            while not self.source.done():
+                if self.stopped.is_set():
+                    return
+                concurrent.futures.wait([self.source], timeout=0.1)
+            result = self.source.result()
+            yield from ([] if result is None else [result] if isinstance(result, LabeledCopies) else result)
+        elif hasattr(self.source, "get"):
+            while not self.stopped.is_set():
+                try:
+                    item = self.source.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is DONE:
+                    return
+                yield item
+        else:
+            yield from self.source
+
+    def run(self):
+        try:
+            for item in self._items():
+                if isinstance(item, WorkerError):
+                    self.error = item.message
+                    continue
+                for G in _expand(item):
+                    if self.stopped.is_set():
+                        return
+                    pos = layout_graph(G, self.count * LIVE_SECTION_HEIGHT + MARGIN)
+                    if pos is None:
+                        continue
+                    self.ready.put((DrawnGraph(G, pos), graph_chart_data(self.mod, G)))
+                    self.count += 1
+        except Exception as exc:
+            self.error = repr(exc)
+        finally:
+            self.finished.set()
+
+
+def visualize(mod, graphs, name, location="default", cancel=None, profile=False):
+    """
+    Open the interactive viewer.
+    graphs is a list of graphs, a LabeledCopies, or a live source: a BackgroundSolve, a queue,
+    a Future or an iterator. Live graphs appear as they arrive; the "Cancel solve" button or Esc
+    stops the layout thread and calls cancel (BackgroundSolve.cancel / Future.cancel by default).
+    profile (or F3) shows FPS and per-stage frame times; F4 starts/stops a cProfile recording and
+    F5 starts tracemalloc / saves a snapshot, both written next to the LaTeX output.
+    The mouse wheel zooms, middle-drag or the arrow keys pan, and Home resets the view.
+    """
+    global show_grid  # Declare the variable as global
+    pygame.init()
+    WIDTH, HEIGHT = DEFAULT_WIDTH, DEFAULT_HEIGHT
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    caption = "Interactive Draggable Graphs"
+    pygame.display.set_caption(caption)
+
+    if isinstance(graphs, BackgroundSolve):
+        cancel = cancel or graphs.cancel
+        graphs = graphs.queue
+    elif isinstance(graphs, concurrent.futures.Future):
+        cancel = cancel or graphs.cancel
+    if isinstance(graphs, LabeledCopies):
+        graphs = graphs.relabeled_graphs()
+
+    live = None
+    if isinstance(graphs, (list, tuple)):
+        pos_list = layout_graphs(graphs, HEIGHT)
+    else:
+        live = LiveLayout(mod, graphs)
+        live.start()
+        graphs, pos_list = [], []
+    drawings = [DrawnGraph(G, pos) for G, pos in zip(graphs, pos_list)]
+
+    def cancel_live():
+        if live is not None and not live.finished.is_set():
+            live.stopped.set()
+            if cancel is not None:
+                cancel()
+
+    get_font.cache_clear()  # fonts do not survive a previous pygame.quit()
+    render_text.cache_clear()
+    _overlay["surface"] = None
+    camera = Camera()
+    panning = False
+    profiler = FrameProfiler(enabled=profile)
+    dump_dir = location if location != "default" else os.path.dirname(os.path.abspath(__file__))
+    x_spacing, y_spacing = 50, 50  # Default node spacing
 
     left_tab_open = True
     right_tab_open = True
@@ -339,33 +629,11 @@ def visualize(mod, graphs, name, location="default"):
     show_edge_labels = True
     show_edge_sublabels = True
 
-    all_graph_data = []
-    for G, pos in zip(graphs, pos_list):
-        edge_lengths = []
-        l_mod_7_values = {8: [], 9: [], 10: [], '∞': []}
-
-        for edge in G.edges():
-            x, y = edge
-            l_e = "∞" if x == math.inf or y == math.inf else min(abs(x - y), mod - abs(x - y))
-
-            if x == math.inf:
-                l_mod_7 = y % 7
-            elif y == math.inf:
-                l_mod_7 = x % 7
-            else:
-                l_mod_7 = (x + y) % 7
-            edge_lengths.append(l_e)
-            if l_e in l_mod_7_values:
-                l_mod_7_values[l_e].append(l_mod_7)
-            else:
-                l_mod_7_values[l_e] = [l_mod_7]
-        T = edge_lengths
-        all_graph_data.append({'T': T, 'l_mod_7_values': l_mod_7_values})
-        # print(l_mod_7_values)
+    all_graph_data = [graph_chart_data(mod, G) for G in graphs]
 
     running = True
     selected_node = None
-    selected_pos = None
+    selected_drawing = None
     dragging_slider = False
     dragging_vertical_slider = False
     dragging_slider_offset = 0
@@ -377,14 +645,63 @@ def visualize(mod, graphs, name, location="default"):
 
     # Button for toggling the grid
     grid_button = {"label": "Toggle Grid", "state": False, "pos": (WIDTH - RIGHT_TAB_WIDTH + MARGIN, 450)}
+    cancel_button_pos = (WIDTH - RIGHT_TAB_WIDTH + MARGIN, 530)
+    shown_status = None
 
     while running:
+        profiler.begin_frame()
+        if live is not None:
+            # Pick up graphs laid out by the background thread since the last frame
+            while True:
+                try:
+                    drawing, graph_data = live.ready.get_nowait()
+                except queue.Empty:
+                    break
+                drawings.append(drawing)
+                graphs.append(drawing.G)
+                pos_list.append(drawing.pos)
+                all_graph_data.append(graph_data)
+            if live.error:
+                status = f"error: {live.error}"
+            elif live.stopped.is_set():
+                status = f"cancelled ({len(graphs)} found)"
+            elif live.finished.is_set() and live.ready.empty():
+                status = f"done ({len(graphs)} found)"
+            else:
+                status = f"solving... ({len(graphs)} found)"
+            if status != shown_status:
+                pygame.display.set_caption(f"{caption} - {status}")
+                shown_status = status
+            profiler.mark("stream")
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                cancel_live()
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                cancel_live()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                profiler.toggle_cprofile(dump_dir)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                profiler.tracemalloc_snapshot(dump_dir)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_HOME:
+                camera.reset()
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP,
+                                                                pygame.K_DOWN):
+                step = 100
+                camera.pan({pygame.K_LEFT: step, pygame.K_RIGHT: -step}.get(event.key, 0),
+                           {pygame.K_UP: step, pygame.K_DOWN: -step}.get(event.key, 0))
+            elif event.type == pygame.MOUSEWHEEL:
+                camera.zoom_at(*pygame.mouse.get_pos(), 1.15 ** event.y)
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_x, mouse_y = event.pos
-                if event.button == 1:  # Left click
+                world_x, world_y = camera.to_world(mouse_x, mouse_y)
+                hit_radius = 10 / camera.zoom
+                if event.button == 2:  # Middle click pans the view
+                    panning = True
+                elif event.button == 1:  # Left click
                     if left_tab_open and NEW_LEFT_TAB_WIDTH - 20 < mouse_x < NEW_LEFT_TAB_WIDTH and HEIGHT - 180 < mouse_y < HEIGHT - 20:
                         dragging_slider = True
                         dragging_slider_offset = mouse_y - slider_rect.y
@@ -402,13 +719,15 @@ def visualize(mod, graphs, name, location="default"):
                     elif right_tab_open and WIDTH - RIGHT_TAB_WIDTH + MARGIN <= mouse_x <= WIDTH - RIGHT_TAB_WIDTH + MARGIN + 140 and 450 <= mouse_y <= 510:
                         show_grid = not show_grid
                         grid_button["state"] = show_grid
+                    elif right_tab_open and live is not None and not live.finished.is_set() and pygame.Rect(
+                            *cancel_button_pos, 140, 60).collidepoint(event.pos):
+                        cancel_live()
                     else:
-                        for pos in pos_list:
-                            for node in pos:
-                                node_x, node_y = pos[node]
-                                if (node_x - mouse_x) ** 2 + (node_y - mouse_y) ** 2 < 10 ** 2:
+                        for drawing in drawings:
+                            for node, (node_x, node_y) in drawing.pos.items():
+                                if (node_x - world_x) ** 2 + (node_y - world_y) ** 2 < hit_radius ** 2:
                                     selected_node = node
-                                    selected_pos = pos
+                                    selected_drawing = drawing
                                     break
                         if right_tab_open:
                             if WIDTH - RIGHT_TAB_WIDTH + MARGIN <= mouse_x <= WIDTH - RIGHT_TAB_WIDTH + MARGIN + 140 and 50 <= mouse_y <= 110:
@@ -427,12 +746,11 @@ def visualize(mod, graphs, name, location="default"):
                                     elif button["label"] == "edge subscript labels":
                                         show_edge_sublabels = button["state"]
                 elif event.button == 3:  # Right click
-                    for pos in pos_list:
-                        for node in pos:
-                            node_x, node_y = pos[node]
-                            if (node_x - mouse_x) ** 2 + (node_y - mouse_y) ** 2 < 10 ** 2:
+                    for drawing in drawings:
+                        for node, (node_x, node_y) in drawing.pos.items():
+                            if (node_x - world_x) ** 2 + (node_y - world_y) ** 2 < hit_radius ** 2:
                                 dragging_graph = True
-                                selected_pos = pos
+                                selected_drawing = drawing
                                 initial_click_position = (mouse_x, mouse_y)
                                 break
 
@@ -441,11 +759,15 @@ def visualize(mod, graphs, name, location="default"):
                     selected_node = None
                     dragging_slider = False
                     dragging_vertical_slider = False
+                elif event.button == 2:
+                    panning = False
                 elif event.button == 3:
                     dragging_graph = False
             elif event.type == pygame.MOUSEMOTION:
+                if panning:
+                    camera.pan(*event.rel)
                 if selected_node is not None:
-                    selected_pos[selected_node] = event.pos
+                    selected_drawing.move_node(selected_node, *camera.to_world(*event.pos))
                 if dragging_slider:
                     mouse_y = event.pos[1]
                     new_y = mouse_y - dragging_slider_offset
@@ -455,29 +777,38 @@ def visualize(mod, graphs, name, location="default"):
                     mouse_y = event.pos[1]
                     new_y = mouse_y - dragging_vertical_slider_offset
                     vertical_slider_rect.y = max(min(new_y, HEIGHT - 20), HEIGHT - 250)
-                    vertex_scale = 1 - ((vertical_slider_rect.y - (HEIGHT - 180)) / 160)
+                    vertex_scale = max(1 - ((vertical_slider_rect.y - (HEIGHT - 180)) / 160), 0.1)
                 if dragging_graph:
                     mouse_x, mouse_y = event.pos
-                    dx = mouse_x - initial_click_position[0]
-                    dy = mouse_y - initial_click_position[1]
-                    for node in selected_pos:
-                        selected_pos[node] = (selected_pos[node][0] + dx, selected_pos[node][1] + dy)
+                    dx = (mouse_x - initial_click_position[0]) / camera.zoom
+                    dy = (mouse_y - initial_click_position[1]) / camera.zoom
+                    selected_drawing.translate(dx, dy)
                     initial_click_position = (mouse_x, mouse_y)
 
+        profiler.mark("events")
+
         screen.fill((255, 255, 255))  # Clear the screen
 
         if show_grid:
-            draw_grid(screen, WIDTH, HEIGHT, x_spacing, y_spacing)
-
-        for G, pos in zip(graphs, pos_list):
-            draw_graph(mod, screen, G, pos, show_vertex_labels, show_vertex_sublabels, show_edge_labels,
-                       show_edge_sublabels, vertex_scale=1.0)
+            draw_grid(screen, WIDTH, HEIGHT, max(int(x_spacing * camera.zoom), 4), max(int(y_spacing * camera.zoom), 4),
+                      *camera.to_screen(0, 0))
+        profiler.mark("clear/grid")
+
+        # Only the part of the graph area not covered by an open tab needs drawing
+        view_left = NEW_LEFT_TAB_WIDTH if left_tab_open else 0
+        view_right = WIDTH - RIGHT_TAB_WIDTH if right_tab_open else WIDTH
+        viewport = pygame.Rect(view_left, 0, view_right - view_left, HEIGHT)
+        for drawing in drawings:
+            draw_graph(mod, screen, drawing, show_vertex_labels, show_vertex_sublabels, show_edge_labels,
+                       show_edge_sublabels, vertex_scale, camera, viewport)
+        profiler.mark("draw_graph")
 
         if left_tab_open:
             pygame.draw.rect(screen, (200, 200, 200),
                              (0, 0, NEW_LEFT_TAB_WIDTH, HEIGHT))  # Shaded gray background for left tab
             draw_boxes_and_charts(screen, all_graph_data, scale_factor)
             draw_slider(screen, slider_rect, scale_factor)
+        profiler.mark("draw_boxes_and_charts")
 
         if right_tab_open:
             pygame.draw.rect(screen, (200, 200, 200), (WIDTH - RIGHT_TAB_WIDTH, 0, RIGHT_TAB_WIDTH, HEIGHT))
@@ -518,7 +849,15 @@ def visualize(mod, graphs, name, location="default"):
             screen.blit(grid_button_text, (grid_button["pos"][0] + 70 - grid_button_text.get_width() // 2,
                                            grid_button["pos"][1] + 30 - grid_button_text.get_height() // 2))
 
+            # Draw cancel button while a live source is still producing graphs
+            if live is not None and not live.finished.is_set():
+                pygame.draw.rect(screen, (255, 0, 0), (*cancel_button_pos, 140, 60))
+                cancel_text = pygame.font.SysFont('Arial', 18).render("Cancel solve", True, (0, 0, 0))
+                screen.blit(cancel_text, (cancel_button_pos[0] + 70 - cancel_text.get_width() // 2,
+                                          cancel_button_pos[1] + 30 - cancel_text.get_height() // 2))
+
             draw_vertical_slider(screen, vertical_slider_rect, vertex_scale)
+        profiler.mark("buttons")
 
         tab_button_font = pygame.font.SysFont('Arial', 14)
         if left_tab_open:
@@ -542,6 +881,13 @@ def visualize(mod, graphs, name, location="default"):
             screen.blit(tab_text,
                         (WIDTH - 10 - tab_text.get_width() // 2, HEIGHT // 2 - 20 + 20 - tab_text.get_height() // 2))
 
+        profiler.mark("tabs")
+
+        if profiler.enabled:
+            draw_profiler_overlay(screen, profiler)
+            profiler.mark("overlay")
+
         pygame.display.flip()
+        profiler.mark("flip")
 
     pygame.quit()
@@ -0,0 +1,67 @@
+import math
+import numpy as np
+import networkx as nx
+from compact_graph import CompactGraph
+
+LABEL_DTYPE = np.int32
+INF_LABEL = -1  # sentinel stored in place of ∞
+
+
+class LabeledCopies:
+    """
+    Solution of a copy labeling: one shared base graph plus one integer label row per copy.
+    labels[i, j] is the label of base node index j in copy i, or INF_LABEL for ∞.
+    Indexing or iterating gives the same networkx graphs the solvers used to return
+    (a copy of the base with a "label" node attribute); they are built only on request.
+    """
+    __slots__ = ("base", "labels")
+
+    def __init__(self, base, labels):
+        self.base = CompactGraph.from_networkx(base)
+        self.labels = np.asarray(labels, dtype=LABEL_DTYPE).reshape(-1, self.base.n)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.graph(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.graph(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.graph(i)
+
+    def __repr__(self):
+        return f"LabeledCopies({self.base!r}, copies={len(self)})"
+
+    def label_of(self, i, node):
+        """Label of node in copy i, "∞" for the sentinel."""
+        value = int(self.labels[i, self.base.index_of(node)])
+        return "∞" if value == INF_LABEL else value
+
+    def labels_of(self, i):
+        """{node: label} for copy i, with "∞" for the sentinel."""
+        return {v: ("∞" if value == INF_LABEL else value)
+                for v, value in zip(self.base.nodes(), self.labels[i].tolist())}
+
+    def graph(self, i):
+        """Copy i as an nx.Graph with labels stored in the "label" node attribute."""
+        g_copy = self.base.to_networkx()
+        nx.set_node_attributes(g_copy, self.labels_of(i), "label")
+        return g_copy
+
+    def relabeled(self, i):
+        """Copy i with every node renamed to its label (∞ becomes math.inf), as drawn by visualize."""
+        names = [math.inf if value == INF_LABEL else value for value in self.labels[i].tolist()]
+        graph = nx.Graph()
+        graph.add_nodes_from(names)
+        graph.add_edges_from((names[u], names[v]) for u, v in self.base.edge_array.tolist())
+        return graph
+
+    def relabeled_graphs(self):
+        return [self.relabeled(i) for i in range(len(self))]
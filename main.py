@@ -1,8 +1,10 @@
 import networkx as nx
 from itertools import combinations
+import argparse
+import contextlib
 import os
-from CP import *
-from graph_visualization import *
+import sys
+import time
 from itertools import combinations_with_replacement
 output_dir = os.path.dirname(os.path.abspath(__file__))  # PATH string this file is contained in
 
@@ -98,10 +100,7 @@ def star(hub, neighbors):
 def complete_k(n):
     graph = nx.Graph()
     graph.add_nodes_from(range(0, n))
-    for node in range(0, n):
-        for neighbor in range(0, n):
-            if node != neighbor:
-                graph.add_edge(node, neighbor)
+    graph.add_edges_from(combinations(range(0, n), 2))
     return graph
 
 
@@ -112,7 +111,8 @@ def is_isomorphic_to_any(graph, graph_list):
     return False
 
 
-def trees(n):
+def iter_trees(n):
+    """Yield the non-isomorphic trees with n edges as they are found."""
     all_trees = []
     nodes = list(range(n + 1))  # A tree with n edges has n+1 nodes
 
@@ -121,12 +121,271 @@ def trees(n):
         new_graph.add_edges_from(edges)
         if nx.is_tree(new_graph) and not is_isomorphic_to_any(new_graph, all_trees):
             all_trees.append(new_graph)
-    return all_trees
+            yield new_graph
+
+
+def trees(n):
+    return list(iter_trees(n))
+
+
+def example_graph():
+    """The 5-cycle with a pendant path used as the default input of the CLI."""
+    graph = nx.Graph()
+    graph.add_edges_from([(0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (4, 5), (5, 6)])
+    return graph
+
 
+FAMILIES = {
+    "trees": iter_trees,
+    "path": lambda n: [path(range(n + 1))],
+    "cycle": lambda n: [cycle(range(n))],
+    "star": lambda n: [star(0, range(1, n + 1))],
+    "complete": lambda n: [complete_k(n)],
+}
 
-'''-----------------------------------------------------------------------------------'''
 
-current_graph = nx.Graph()
-current_graph.add_edges_from([(0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (4, 5), (5, 6)])
+def _parse_node(token):
+    if token in ("inf", "∞"):
+        return float("inf")
+    try:
+        return int(token)
+    except ValueError:
+        return token
 
-labeled_current_graph = labeling_1_rotational_lambda(current_graph, 3)
+
+class GraphFormatError(ValueError):
+    """Input that is not valid in the format it is read as."""
+
+
+def _detect_format(lines):
+    """graph6 if the first graph line is a graph6 header, a sparse6 record or a single token, else edgelist."""
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith((">>graph6<<", ">>sparse6<<", ":")) or len(line.split()) == 1:
+            return "graph6"
+        return "edgelist"
+    return "edgelist"
+
+
+def read_graphs(source, fmt="auto"):
+    """
+    Read graphs from a file ("-" for stdin).
+    - graph6 / sparse6: one graph per line (.g6, .s6).
+    - catalog: an indexed graph catalog written by catalog.py (.gcat).
+    - edgelist: one "u v" edge per line, graphs separated by blank lines.
+    With fmt="auto" the extension decides; without a known one (e.g. stdin) the content does.
+    Malformed lines raise GraphFormatError.
+    """
+    extension = os.path.splitext(source)[1]
+    if fmt == "auto":
+        fmt = {".g6": "graph6", ".s6": "graph6", ".gcat": "catalog"}.get(extension, "auto")
+    if fmt == "catalog":
+        from catalog import Catalog
+        with Catalog(source) as graph_catalog:
+            return list(graph_catalog)
+    stream = sys.stdin.buffer if source == "-" else open(source, "rb")
+    with stream:
+        lines = [line.strip() for line in stream.read().decode().splitlines()]
+    if fmt == "auto":
+        fmt = _detect_format(lines)
+
+    graphs = []
+    if fmt == "graph6":
+        for number, line in enumerate(lines, 1):
+            if not line or line.startswith(">>"):
+                continue
+            try:
+                if line.startswith(":"):
+                    graphs.append(nx.from_sparse6_bytes(line.encode()))
+                else:
+                    graphs.append(nx.from_graph6_bytes(line.encode()))
+            except (nx.NetworkXError, ValueError) as exc:
+                raise GraphFormatError(f"{source}:{number}: not a graph6/sparse6 record ({exc})")
+        return graphs
+
+    edges = []
+    for number, line in enumerate(lines + [""], 1):
+        if line.startswith("#"):
+            continue
+        if not line:
+            if edges:
+                graphs.append(build([], edges))
+                edges = []
+            continue
+        tokens = line.split()
+        if len(tokens) < 2:
+            raise GraphFormatError(f"{source}:{number}: expected an edge \"u v\", got {line!r}")
+        edges.append((_parse_node(tokens[0]), _parse_node(tokens[1])))
+    return graphs
+
+
+def write_graphs(graphs, target, fmt="edgelist"):
+    """Write graphs to a file ("-" for stdout) in the formats read by read_graphs."""
+    if fmt == "catalog":
+        from catalog import write_catalog
+        write_catalog(target, graphs)
+        return
+    stream = sys.stdout if target == "-" else open(target, "w")
+    try:
+        for graph in graphs:
+            if fmt == "graph6":
+                graph = nx.convert_node_labels_to_integers(graph)
+                stream.write(nx.to_graph6_bytes(graph, header=False).decode())
+            else:
+                for u, v in graph.edges():
+                    stream.write(f"{u} {v}\n")
+                stream.write("\n")
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+def _input_graphs(args):
+    return read_graphs(args.input, args.format) if args.input else [example_graph()]
+
+
+def _solve(graph, p, decompose=False, r=None, output=None):
+    """Solve one graph; the solver's progress goes to stderr when the result is written to stdout."""
+    from CP import labeling_1_rotational_lambda, labeling_1_to_k
+    with contextlib.redirect_stdout(sys.stderr if output == "-" else sys.stdout):
+        if r is not None:
+            return labeling_1_to_k(graph, r)
+        return labeling_1_rotational_lambda(graph, p, decompose=decompose)
+
+
+def _solved_or_input_graphs(args):
+    """Input graphs, or the relabeled copies of their solutions when --solve P is given."""
+    graphs = _input_graphs(args)
+    if args.solve is None:
+        return graphs
+    solved = []
+    for graph in graphs:
+        result = _solve(graph, args.solve, output=args.output)
+        if result is not None:
+            solved.extend(result.relabeled_graphs())
+    return solved
+
+
+def cmd_solve(args):
+    solved = []
+    found = 0
+    for graph in _input_graphs(args):
+        result = _solve(graph, args.p, args.decompose, args.r, args.output)
+        if result is None:
+            continue
+        found += 1
+        solved.extend(result.relabeled_graphs())
+    if args.output:
+        write_graphs(solved, args.output, args.to)
+    return 0 if found else 1
+
+
+def cmd_enumerate(args):
+    write_graphs(FAMILIES[args.family](args.n), args.output, args.to)
+    return 0
+
+
+def cmd_render(args):
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    from graph_visualization import visualize
+    if args.solve is None:
+        visualize(args.mod, _input_graphs(args), args.name, args.location, profile=args.profile)
+        return 0
+    # Solve in a worker process and draw the copies as they are found
+    from background import BackgroundSolve
+    from CP import iter_solutions
+    solve = BackgroundSolve(iter_solutions, _input_graphs(args), args.solve)
+    try:
+        visualize(args.mod, solve, args.name, args.location, profile=args.profile)
+    finally:
+        solve.cancel()
+    return 0
+
+
+def cmd_export(args):
+    graphs = _solved_or_input_graphs(args)
+    if args.to != "latex":
+        write_graphs(graphs, args.output, args.to)
+        return 0
+    if args.mod is None:
+        print("--mod is required for LaTeX export", file=sys.stderr)
+        return 2
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    from graph_visualization import generate_latex, layout_graphs
+    generate_latex(args.mod, layout_graphs(graphs), graphs, args.location, args.name,
+                   True, True, True, True)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Build, label and draw graphs.")
+    parser.add_argument("--time", action="store_true", help="print wall time to stderr")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_input(p):
+        p.add_argument("input", nargs="?", help='graph file, "-" for stdin (default: example graph)')
+        p.add_argument("--format", choices=["auto", "edgelist", "graph6", "catalog"], default="auto")
+
+    p = sub.add_parser("solve", help="find a 1-rotational λ_p-labeling (or a (1-2-...-k)-labeling with -r)")
+    add_input(p)
+    p.add_argument("-p", type=int, default=3)
+    p.add_argument("--decompose", action="store_true", help="two-phase solve with concurrent per-copy models")
+    p.add_argument("-r", type=int, help="find a (1-2-...-k)-labeling with k = r // 2 instead")
+    p.add_argument("-o", "--output", help='write the labeled copies here ("-" for stdout)')
+    p.add_argument("--to", choices=["edgelist"], default="edgelist",
+                   help="graph6 and catalog records drop the vertex labels, so solved copies are edge lists")
+    p.set_defaults(func=cmd_solve)
+
+    p = sub.add_parser("enumerate", help="write a graph family")
+    p.add_argument("family", choices=sorted(FAMILIES))
+    p.add_argument("n", type=int, help="edges for trees/path/star, nodes for cycle/complete")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("--to", choices=["edgelist", "graph6", "catalog"], default="graph6")
+    p.set_defaults(func=cmd_enumerate)
+
+    p = sub.add_parser("render", help="open the interactive viewer")
+    add_input(p)
+    p.add_argument("--mod", type=int, required=True)
+    p.add_argument("--solve", type=int, metavar="P", help="solve with this p first and draw the copies")
+    p.add_argument("--name", default="graphs")
+    p.add_argument("--location", default="default")
+    p.add_argument("--profile", action="store_true", help="show the frame-time overlay (toggle with F3)")
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("export", help="convert graphs or write LaTeX")
+    add_input(p)
+    p.add_argument("--to", choices=["edgelist", "graph6", "catalog", "latex"], default="graph6")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("--mod", type=int)
+    p.add_argument("--solve", type=int, metavar="P")
+    p.add_argument("--name", default="graphs")
+    p.add_argument("--location", default="default")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def _check_output(parser, args):
+    """Reject outputs that would lose the result (solved copies are named by their labels) or go nowhere."""
+    if args.command == "export" and args.solve is not None and args.to in ("graph6", "catalog"):
+        parser.error(f"{args.to} drops the vertex labels; write solved copies with --to edgelist")
+    if getattr(args, "to", None) == "catalog" and args.output == "-":
+        parser.error("--to catalog needs a file path (-o), it cannot be written to stdout")
+
+
+def main(argv=None):
+    start = time.perf_counter()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    _check_output(parser, args)
+    try:
+        status = args.func(args)
+    except GraphFormatError as exc:
+        parser.error(str(exc))
+    if args.time:
+        print(f"{args.command}: {time.perf_counter() - start:.3f}s", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())